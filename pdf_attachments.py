@@ -15,38 +15,73 @@ Exit codes:
 """
 # /// script
 # requires-python = ">=3.10"
-# dependencies = ["pypdf", "typer"]
+# dependencies = ["pypdf>=6.9.0", "typer"]
 # ///
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import mmap
+import os
+import shutil
+import zlib
+from contextlib import ExitStack, suppress
+from dataclasses import dataclass, field
+from itertools import chain
 from pathlib import Path
-from typing import Annotated
+from typing import TYPE_CHECKING, Annotated, Any, BinaryIO
+from weakref import WeakKeyDictionary
 
 import typer
-from pypdf import PdfReader, PdfWriter
+
+# pypdf is imported inside the functions that use it: it accounts for about
+# half of the module import time, which `--help` and argument errors never need.
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from pypdf import PdfReader
 
 # ---------------------------------------------------------------------------
 # Data model
 # ---------------------------------------------------------------------------
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Attachment:
     name: str
     size: int | None = None
     description: str = ""
     page: int | None = None
     data: bytes | None = None
+    # Embedded-file stream object, kept so the data can be decoded on demand.
+    _stream: Any = field(default=None, repr=False, compare=False)
+
+    @property
+    def has_data(self) -> bool:
+        """Whether the attachment carries (or can decode) an embedded file stream."""
+        return self.data is not None or self._stream is not None
+
+    def write_data(self, fh: BinaryIO) -> int:
+        """Write the attachment's bytes to ``fh`` and return the number written.
+
+        The stream is decoded only for the duration of the call, so the bytes
+        are not retained on the attachment. Plain and Flate-compressed streams
+        are decoded in fixed-size chunks, bounding memory use regardless of
+        the attachment's size.
+
+        Raises:
+            CorruptAttachmentError: If the stream exists but cannot be decoded.
+        """
+        if self.data is not None:
+            return _write_all(fh, self.data)
+        if self._stream is None:
+            return 0
+        return _copy_stream(self._stream, fh)
 
     def __str__(self) -> str:
         location = f" (page {self.page})" if self.page else ""
         size = f"{self.size} bytes" if self.size is not None else "unknown"
-        lines = [f"  {self.name}{location}  —  {size}"]
-        if self.description:
-            lines.append(f"    {self.description}")
-        return "\n".join(lines)
+        description = f"\n    {self.description}" if self.description else ""
+        return f"  {self.name}{location}  —  {size}{description}"
 
 
 # ---------------------------------------------------------------------------
@@ -54,81 +89,348 @@ class Attachment:
 # ---------------------------------------------------------------------------
 
 
-def _stream_size(ef: dict) -> int | None:
-    """Extract byte size from an embedded file stream."""
-    stream = ef.get("/F")
-    if stream is None:
-        return None
-    obj = stream.get_object()
-    params = obj.get("/Params", {})
-    if hasattr(params, "get") and "/Size" in params:
-        return int(params["/Size"])
-    try:
-        return len(obj.get_data())
-    except Exception:
-        return None
-
-
 class CorruptAttachmentError(Exception):
     """Raised when an attachment exists but its data cannot be decoded."""
 
 
-def _stream_data(ef: dict) -> bytes | None:
-    """Extract raw bytes from an embedded file stream.
+def _decode_stream(stream: Any) -> bytes:
+    """Decode an embedded file stream (direct or indirect) to bytes.
 
     Raises:
-        CorruptAttachmentError: If the stream exists but cannot be decoded.
+        CorruptAttachmentError: If the stream cannot be decoded.
     """
-    stream = ef.get("/F")
-    if stream is None:
-        return None
     try:
         return stream.get_object().get_data()
     except Exception as exc:
         raise CorruptAttachmentError(f"Failed to decode attachment stream: {exc}") from exc
 
 
-def _get_document_attachments(reader: PdfReader, *, with_data: bool = False) -> list[Attachment]:
-    """Get attachments from the document-level /EmbeddedFiles catalog."""
-    catalog = reader.trailer["/Root"]
-    names = catalog.get("/Names", {}).get("/EmbeddedFiles", {}).get("/Names", [])
-    attachments = []
-    for i in range(0, len(names), 2):
-        spec = names[i + 1].get_object()
-        ef = spec.get("/EF", {})
-        attachments.append(
-            Attachment(
-                name=str(names[i]),
-                size=_stream_size(ef),
-                description=str(spec.get("/Desc", "")),
-                data=_stream_data(ef) if with_data else None,
-            )
-        )
-    return attachments
+def _embedded_stream(spec: Any) -> Any:
+    """Return the resolved ``/EF /F`` stream of a file spec, or None if it has none."""
+    try:
+        return spec["/EF"]["/F"]
+    except (KeyError, TypeError):
+        return None
+
+
+def _stream_info(
+    stream: Any, *, with_data: bool = False, with_size: bool = True
+) -> tuple[int | None, bytes | None]:
+    """Return ``(size, data)`` for an embedded file stream, decoding it at most once.
+
+    The size comes from ``/Params /Size`` when present, which costs only a
+    dictionary lookup. Otherwise the stream has to be decoded to measure it;
+    without ``with_data`` that is done by streaming it into a byte counter,
+    so the decoded bytes are never held in memory. With ``with_size=False``
+    that measuring pass is skipped and the size is None. ``data`` is only
+    returned when ``with_data`` is set.
+
+    Raises:
+        CorruptAttachmentError: If ``with_data`` is set and the stream exists
+            but cannot be decoded.
+    """
+    if stream is None:
+        return None, None
+    obj = stream.get_object()
+    try:
+        size = int(obj["/Params"]["/Size"])
+    except (KeyError, TypeError, ValueError):
+        size = None
+    if with_data:
+        data = _decode_stream(obj)
+        return (len(data) if size is None else size), data
+    if size is None and with_size:
+        with suppress(Exception):
+            size = _copy_stream(obj, _ByteCounter())
+    return size, None
+
+
+class _ByteCounter:
+    """Write-only sink that counts bytes, used to size a stream without keeping it."""
+
+    def __init__(self) -> None:
+        self.count = 0
+
+    def write(self, data: bytes) -> int:
+        self.count += len(data)
+        return len(data)
+
+    # Rewinding support lets _copy_stream fall back to pypdf's decoder.
+    def seekable(self) -> bool:
+        return True
 
+    def tell(self) -> int:
+        return self.count
 
-def _get_page_attachments(reader: PdfReader, *, with_data: bool = False) -> list[Attachment]:
-    """Get attachments from page-level /FileAttachment annotations."""
-    attachments = []
-    for page_num, page in enumerate(reader.pages, 1):
+    def seek(self, pos: int) -> int:
+        self.count = pos
+        return pos
+
+    def truncate(self) -> int:
+        return self.count
+
+
+def _map_file(
+    path: Path, stack: ExitStack, *, exclude: os.stat_result | None = None
+) -> memoryview | bytes:
+    """Map a file read-only and return a zero-copy view of its contents.
+
+    The mapping stays open until ``stack`` is closed, and the kernel is asked
+    to start reading it in the background. Empty or unmappable files, and the
+    file identified by ``exclude`` (typically the output about to be
+    truncated), are read into memory through the same unbuffered handle.
+    """
+    with open(path, "rb", buffering=0) as fh:
+        st = os.fstat(fh.fileno())
+        if st.st_size == 0 or (
+            exclude is not None and (st.st_dev, st.st_ino) == (exclude.st_dev, exclude.st_ino)
+        ):
+            return fh.readall()
+        try:
+            mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            return fh.readall()
+    stack.callback(mm.close)
+    if hasattr(mmap, "MADV_WILLNEED"):  # not available on Windows
+        mm.madvise(mmap.MADV_WILLNEED)
+    view = memoryview(mm)
+    stack.callback(view.release)
+    return view
+
+
+def _write_all(fh: BinaryIO, data: bytes) -> int:
+    """Write all of ``data`` to ``fh``, retrying on short (unbuffered) writes."""
+    view = memoryview(data)
+    while view:
+        view = view[fh.write(view) :]
+    return len(data)
+
+
+_CHUNK_SIZE = 1 << 20
+
+
+def _raw_stream_data(obj: Any) -> tuple[bytes, bool] | None:
+    """Return ``(raw, compressed)`` for a resolved stream zlib can decode directly.
+
+    That covers unfiltered streams and a lone /FlateDecode without
+    /DecodeParms, the common cases for attachments; ``compressed`` says
+    whether ``raw`` still needs inflating. Returns None for anything that
+    must go through pypdf's decoder.
+    """
+    raw = getattr(obj, "_data", None)
+    filters = obj.get("/Filter")
+    if isinstance(filters, list) and len(filters) == 1:
+        filters = filters[0]
+    if (
+        not isinstance(raw, bytes)
+        or getattr(obj, "decoded_self", None) is not None
+        or "/DecodeParms" in obj
+        or filters not in (None, "/FlateDecode", "/Fl")
+    ):
+        return None
+    return raw, filters is not None
+
+
+def _copy_stream(stream: Any, fh: BinaryIO) -> int:
+    """Decode an embedded file stream into ``fh`` and return the bytes written.
+
+    Streams that :func:`_raw_stream_data` accepts are written or inflated
+    chunk by chunk from the raw stream bytes. Anything else goes through
+    pypdf's whole-buffer decoder. If streaming inflate fails part-way, a
+    seekable ``fh`` is rewound and the pypdf decoder (which can recover some
+    damaged streams) is used.
+
+    Raises:
+        CorruptAttachmentError: If the stream cannot be decoded.
+    """
+    obj = stream.get_object()
+    fast = _raw_stream_data(obj)
+    if fast is None:
+        return _write_all(fh, _decode_stream(obj))
+    raw, compressed = fast
+    if not compressed:
+        return _write_all(fh, raw)
+
+    start = fh.tell() if fh.seekable() else None
+    inflater = zlib.decompressobj()
+    view = memoryview(raw)
+    written = 0
+    try:
+        for offset in range(0, len(view), _CHUNK_SIZE):
+            chunk = view[offset : offset + _CHUNK_SIZE]
+            while chunk:
+                written += _write_all(fh, inflater.decompress(chunk, _CHUNK_SIZE))
+                chunk = inflater.unconsumed_tail
+            if inflater.eof:
+                break
+        written += _write_all(fh, inflater.flush())
+    except zlib.error as exc:
+        if start is None:
+            raise CorruptAttachmentError(f"Failed to decode attachment stream: {exc}") from exc
+        fh.seek(start)
+        fh.truncate()
+        return _write_all(fh, _decode_stream(obj))
+    return written
+
+
+def _iter_document_specs(reader: PdfReader) -> Iterator[tuple[str, Any]]:
+    """Yield ``(name, spec_ref)`` pairs from the document-level /EmbeddedFiles catalog.
+
+    File specs are yielded unresolved so callers only pay for the ones they use.
+    """
+    # Subscripting resolves each indirect level directly and stops at the
+    # first missing one, without allocating an empty default per level.
+    try:
+        names = reader.trailer["/Root"]["/Names"]["/EmbeddedFiles"]["/Names"]
+    except (KeyError, TypeError):
+        return
+    # /Names is a flat [name1, spec1, name2, spec2, ...] array; zipping one
+    # iterator with itself walks it pairwise without any index arithmetic.
+    # A dangling name in a malformed (odd-length) array is ignored.
+    pairs = iter(names)
+    for raw_name, raw_spec in zip(pairs, pairs, strict=False):
+        yield str(raw_name), raw_spec
+
+
+def _iter_page_specs(reader: PdfReader) -> Iterator[tuple[str, int, Any, Any]]:
+    """Yield ``(name, page_num, annot, fs)`` for page-level /FileAttachment annotations."""
+    # Iterating reader.pages goes through pypdf's virtual list (a length check
+    # and a get_page call per index); the flattened list is a plain list.
+    pages = reader.flattened_pages or list(reader.pages)
+    for page_num, page in enumerate(pages, 1):
         for annot_ref in page.get("/Annots", []):
             annot = annot_ref.get_object()
             if annot.get("/Subtype") != "/FileAttachment":
                 continue
-            fs = annot.get("/FS", {})
-            if hasattr(fs, "get_object"):
-                fs = fs.get_object()
-            ef = fs.get("/EF", {})
-            attachments.append(
-                Attachment(
-                    name=str(fs.get("/F", fs.get("/UF", "unknown"))),
-                    size=_stream_size(ef),
-                    description=str(fs.get("/Desc", annot.get("/Contents", ""))),
-                    page=page_num,
-                    data=_stream_data(ef) if with_data else None,
-                )
+            # Subscripting (unlike .get) resolves an indirect /FS reference.
+            try:
+                fs = annot["/FS"]
+            except KeyError:
+                fs = {}
+            yield str(fs.get("/F", fs.get("/UF", "unknown"))), page_num, annot, fs
+
+
+def _iter_attachment_names(reader: PdfReader) -> Iterator[str]:
+    """Yield the name of every attachment without building or sizing it."""
+    for name, _ in _iter_document_specs(reader):
+        yield name
+    for name, *_ in _iter_page_specs(reader):
+        yield name
+
+
+def _document_attachment(
+    name: str, raw_spec: Any, *, with_data: bool = False, with_size: bool = True
+) -> Attachment:
+    """Build an attachment from a document-level file spec."""
+    spec = raw_spec.get_object()
+    stream = _embedded_stream(spec)
+    size, data = _stream_info(stream, with_data=with_data, with_size=with_size)
+    return Attachment(
+        name=name,
+        size=size,
+        description=str(spec.get("/Desc", "")),
+        data=data,
+        _stream=stream,
+    )
+
+
+def _page_attachment(
+    name: str,
+    page_num: int,
+    annot: Any,
+    fs: Any,
+    *,
+    with_data: bool = False,
+    with_size: bool = True,
+) -> Attachment:
+    """Build an attachment from a page-level /FileAttachment annotation."""
+    stream = _embedded_stream(fs)
+    size, data = _stream_info(stream, with_data=with_data, with_size=with_size)
+    return Attachment(
+        name=name,
+        size=size,
+        description=str(fs.get("/Desc", annot.get("/Contents", ""))),
+        page=page_num,
+        data=data,
+        _stream=stream,
+    )
+
+
+def _iter_document_attachments(
+    reader: PdfReader,
+    *,
+    with_data: bool = False,
+    with_size: bool = True,
+    name: str | None = None,
+) -> Iterator[Attachment]:
+    """Yield attachments from the document-level /EmbeddedFiles catalog.
+
+    Attachments are built (and decoded) only as the caller consumes them. If
+    ``name`` is given, only attachments with that exact name are built, so
+    unrelated streams are never touched.
+    """
+    for att_name, raw_spec in _iter_document_specs(reader):
+        if name is None or att_name == name:
+            yield _document_attachment(att_name, raw_spec, with_data=with_data, with_size=with_size)
+
+
+def _iter_page_attachments(
+    reader: PdfReader,
+    *,
+    with_data: bool = False,
+    with_size: bool = True,
+    name: str | None = None,
+) -> Iterator[Attachment]:
+    """Yield attachments from page-level /FileAttachment annotations.
+
+    Like :func:`_iter_document_attachments`, attachments are built lazily and
+    ``name`` restricts which ones are built.
+    """
+    for att_name, page_num, annot, fs in _iter_page_specs(reader):
+        if name is None or att_name == name:
+            yield _page_attachment(
+                att_name, page_num, annot, fs, with_data=with_data, with_size=with_size
             )
-    return attachments
+
+
+# Per-reader map of attachment name -> (page, spec, annot) for its first
+# occurrence. get_attachment only indexes readers supplied by the caller,
+# since a reader it opens itself is queried once; get_attachments_bulk also
+# indexes its own reader, which it queries once per requested name.
+_INDEX: WeakKeyDictionary[PdfReader, dict[str, tuple[int | None, Any, Any]]] = WeakKeyDictionary()
+
+
+def _attachment_index(reader: PdfReader) -> dict[str, tuple[int | None, Any, Any]]:
+    """Return the reader's name index, walking the catalog and pages on first use."""
+    index = _INDEX.get(reader)
+    if index is None:
+        index = {}
+        for name, raw_spec in _iter_document_specs(reader):
+            index.setdefault(name, (None, raw_spec, None))
+        for name, page_num, annot, fs in _iter_page_specs(reader):
+            index.setdefault(name, (page_num, fs, annot))
+        _INDEX[reader] = index
+    return index
+
+
+def _open_reader(pdf: str | PdfReader) -> PdfReader:
+    """Return ``pdf`` itself if it is already a reader, otherwise open it."""
+    from pypdf import PdfReader
+
+    return pdf if isinstance(pdf, PdfReader) else PdfReader(pdf)
+
+
+def _incremental_is_safe(reader: PdfReader) -> bool:
+    """Whether pypdf can append an incremental update without reusing object numbers.
+
+    pypdf numbers new objects after the highest one listed in the xref, but
+    an xref *stream* (which pypdf itself writes for incremental updates) is
+    not listed in its own xref. A new object would then overwrite it, and the
+    attachment stored there decodes to xref bytes. That shows up as a
+    trailer /Size beyond the highest listed object number.
+    """
+    listed = chain(chain.from_iterable(reader.xref.values()), reader.xref_objStm)
+    return max(listed, default=0) + 1 >= reader.trailer.get("/Size", 0)
 
 
 # ---------------------------------------------------------------------------
@@ -136,22 +438,104 @@ def _get_page_attachments(reader: PdfReader, *, with_data: bool = False) -> list
 # ---------------------------------------------------------------------------
 
 
-def list_attachments(pdf_path: str) -> list[Attachment]:
-    """Return all attachments found in a PDF."""
-    reader = PdfReader(pdf_path)
-    return _get_document_attachments(reader) + _get_page_attachments(reader)
+def list_attachments(
+    pdf_path: str | PdfReader, *, include_page_annots: bool = True
+) -> list[Attachment]:
+    """Return all attachments found in a PDF (a path or an open ``PdfReader``).
+
+    With ``include_page_annots=False`` only the document-level catalog is
+    read and the per-page annotation walk is skipped, which is much cheaper
+    on long documents but misses /FileAttachment annotations.
+    """
+    reader = _open_reader(pdf_path)
+    attachments = list(_iter_document_attachments(reader))
+    if include_page_annots:
+        attachments.extend(_iter_page_attachments(reader))
+    return attachments
 
 
-def get_attachment(pdf_path: str, name: str) -> Attachment | None:
-    """Extract a single attachment by name, including its data."""
-    reader = PdfReader(pdf_path)
-    all_attachments = _get_document_attachments(reader, with_data=True) + _get_page_attachments(
-        reader, with_data=True
+def get_attachment(
+    pdf_path: str | PdfReader, name: str, *, with_data: bool = True, with_size: bool = True
+) -> Attachment | None:
+    """Extract a single attachment by name, including its data.
+
+    ``pdf_path`` may also be an open ``PdfReader``; repeated lookups on the
+    same reader then share a name index instead of rescanning the pages.
+
+    With ``with_data=False`` the data is not decoded up front; use
+    :meth:`Attachment.write_data` to stream it to a file instead.
+    If ``with_size`` is also false, a stream without ``/Params /Size`` is not
+    decoded just to measure it, and ``size`` is None; the count returned by
+    :meth:`Attachment.write_data` gives the size instead.
+    """
+    from pypdf import PdfReader
+
+    if isinstance(pdf_path, PdfReader):
+        entry = _attachment_index(pdf_path).get(name)
+        if entry is None:
+            return None
+        page_num, spec, annot = entry
+        if page_num is None:
+            return _document_attachment(name, spec, with_data=with_data, with_size=with_size)
+        return _page_attachment(
+            name, page_num, annot, spec, with_data=with_data, with_size=with_size
+        )
+
+    reader = _open_reader(pdf_path)
+    # Document-level attachments take precedence; pages are only walked on a
+    # miss, and only the first match is ever built and decoded.
+    matches = chain(
+        _iter_document_attachments(reader, with_data=with_data, with_size=with_size, name=name),
+        _iter_page_attachments(reader, with_data=with_data, with_size=with_size, name=name),
     )
-    for att in all_attachments:
-        if att.name == name:
-            return att
-    return None
+    return next(matches, None)
+
+
+def get_attachments_bulk(
+    pdf_path: str | PdfReader, names: list[str], *, max_workers: int | None = None
+) -> dict[str, bytes]:
+    """Extract several attachments by name and return their decoded bytes.
+
+    The PDF is indexed once for all ``names``; names that are not found (or
+    have no embedded stream) are left out of the result. Flate-compressed
+    streams are inflated with :func:`zlib.decompress` on a thread pool of
+    ``max_workers`` threads, which releases the GIL, so large batches decode
+    in parallel. Other streams are decoded by pypdf on the calling thread.
+
+    Raises:
+        CorruptAttachmentError: If a requested stream cannot be decoded.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    index = _attachment_index(_open_reader(pdf_path))
+    results: dict[str, bytes] = {}
+    compressed: dict[str, tuple[Any, bytes]] = {}
+    for name in dict.fromkeys(names):
+        entry = index.get(name)
+        stream = _embedded_stream(entry[1]) if entry is not None else None
+        if stream is None:
+            continue
+        obj = stream.get_object()
+        fast = _raw_stream_data(obj)
+        if fast is None:
+            results[name] = _decode_stream(obj)
+        elif not fast[1]:
+            results[name] = fast[0]
+        else:
+            compressed[name] = (obj, fast[0])
+    if not compressed:
+        return results
+
+    with ThreadPoolExecutor(max_workers) as pool:
+        futures = {name: pool.submit(zlib.decompress, raw) for name, (_, raw) in compressed.items()}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except zlib.error:
+                # pypdf's decoder can recover some damaged or truncated streams.
+                results[name] = _decode_stream(compressed[name][0])
+    # Return in request order, as the pooled results were collected last.
+    return {name: results[name] for name in dict.fromkeys(names) if name in results}
 
 
 def add_attachment(
@@ -160,6 +544,7 @@ def add_attachment(
     output_path: str,
     *,
     renames: dict[str, str] | None = None,
+    incremental: bool = False,
 ) -> int:
     """Add one or more file attachments to a PDF and write the result.
 
@@ -168,6 +553,10 @@ def add_attachment(
         files: Files to embed.
         output_path: Where to write the resulting PDF.
         renames: Optional mapping of original filename → new attachment name.
+        incremental: Append the new objects as an incremental update after the
+            original bytes instead of re-serializing the whole document.
+            Encrypted PDFs, and PDFs whose object numbers pypdf's incremental
+            writer would reuse, are rewritten in full instead.
 
     Raises:
         ValueError: If a resulting attachment name duplicates an existing one
@@ -191,22 +580,42 @@ def add_attachment(
             )
         seen[name] = file
 
-    # Check for collisions with existing attachments in the PDF.
-    existing = {a.name for a in list_attachments(pdf_path)}
-    collisions = [name for _, name in resolved if name in existing]
+    # Check for collisions with existing attachments in the PDF. The same
+    # reader is then handed to the writer so the file is only parsed once.
+    from pypdf import PdfReader, PdfWriter
+
+    reader = PdfReader(pdf_path)
+    # Probe the (small) set of input names while streaming the PDF's names,
+    # rather than materialising every existing name first, then report the
+    # matches in input order.
+    found = {n for n in _iter_attachment_names(reader) if n in seen}
+    collisions = [n for _, n in resolved if n in found]
     if collisions:
         names = ", ".join(f"'{n}'" for n in collisions)
         raise ValueError(
             f"Attachment(s) already exist in the PDF: {names}. Use --name to rename them."
         )
 
-    writer = PdfWriter(clone_from=pdf_path)
-
-    for file, name in resolved:
-        writer.add_attachment(name, file.read_bytes())
-
-    with open(output_path, "wb") as f:
-        writer.write(f)
+    with ExitStack() as stack:
+        # Inputs are mapped rather than copied into memory, and mapped before
+        # cloning so the kernel's readahead overlaps pypdf's clone. A file that
+        # is also the output would be truncated under its own mapping, so it is
+        # read eagerly instead (compared by inode, one fstat per input).
+        try:
+            output_stat: os.stat_result | None = os.stat(output_path)
+        except FileNotFoundError:
+            output_stat = None
+        payloads = [(name, _map_file(file, stack, exclude=output_stat)) for file, name in resolved]
+
+        if incremental and not reader.is_encrypted and _incremental_is_safe(reader):
+            writer = PdfWriter(reader, incremental=True)
+        else:
+            writer = PdfWriter(clone_from=reader)
+        for name, data in payloads:
+            writer.add_attachment(name, data)
+
+        with open(output_path, "wb") as f:
+            writer.write(f)
 
     return len(files)
 
@@ -245,6 +654,16 @@ def cmd_list(
         Path,
         typer.Argument(help="Path to the input PDF file to inspect."),
     ],
+    page_annots: Annotated[
+        bool,
+        typer.Option(
+            "--page-annots/--no-page-annots",
+            help=(
+                "Also scan every page for FileAttachment annotations (default). "
+                "--no-page-annots lists document-level attachments only, which is faster."
+            ),
+        ),
+    ] = True,
 ) -> None:
     """Output format (stdout, one attachment per block):
 
@@ -257,16 +676,75 @@ def cmd_list(
         typer.echo(f"Error: file not found: {pdf}", err=True)
         raise typer.Exit(1)
 
-    attachments = list_attachments(str(pdf))
+    attachments = list_attachments(str(pdf), include_page_annots=page_annots)
     typer.echo(f"PDF: {pdf}")
     typer.echo(f"Attachments: {len(attachments)}")
     typer.echo("-" * 50)
     if attachments:
-        typer.echo("\n".join(str(a) for a in attachments))
+        typer.echo("\n".join([str(a) for a in attachments]))
     else:
         typer.echo("  (none)")
 
 
+def _open_part(out: Path) -> tuple[BinaryIO, Path]:
+    """Create a new, unbuffered temporary file beside ``out`` for writing."""
+    n = 0
+    while True:
+        part = out.with_name(f".{out.name}.{os.getpid()}.{n}.part")
+        try:
+            return open(part, "xb", buffering=0), part
+        except FileExistsError:  # left behind by an earlier, killed run
+            n += 1
+
+
+def _write_output(att: Attachment, out: Path) -> int:
+    """Write an attachment's bytes to ``out`` and return the number written.
+
+    An existing ``out`` is only touched once decoding has succeeded, so a
+    corrupt attachment never truncates it. A new or plain (regular, singly
+    linked, own) file is replaced atomically by a finished temporary file
+    beside it. Anything else (a device such as /dev/stdout, a symlink, a
+    hard-linked or foreign-owned file, or a file in a read-only directory)
+    is decoded to a scratch file first and then written through in place.
+
+    Raises:
+        CorruptAttachmentError: If the attachment cannot be decoded.
+    """
+    import stat
+    import tempfile
+
+    try:
+        st: os.stat_result | None = os.lstat(out)
+    except FileNotFoundError:
+        st = None
+    if st is None or (
+        stat.S_ISREG(st.st_mode)
+        and st.st_nlink == 1
+        and (not hasattr(os, "geteuid") or st.st_uid == os.geteuid())
+    ):
+        try:
+            fh, part = _open_part(out)
+        except PermissionError:
+            pass
+        else:
+            try:
+                with fh:
+                    size = att.write_data(fh)
+                if st is not None:
+                    os.chmod(part, stat.S_IMODE(st.st_mode))
+                os.replace(part, out)
+                return size
+            finally:
+                part.unlink(missing_ok=True)
+
+    with tempfile.TemporaryFile() as scratch:
+        size = att.write_data(scratch)
+        scratch.seek(0)
+        with open(out, "wb") as fh:
+            shutil.copyfileobj(scratch, fh)
+    return size
+
+
 @app.command("get", help="Extract a single attachment by its exact filename and save it to disk.")
 def cmd_get(
     pdf: Annotated[
@@ -297,18 +775,22 @@ def cmd_get(
         typer.echo(f"Error: file not found: {pdf}", err=True)
         raise typer.Exit(1)
 
-    try:
-        att = get_attachment(str(pdf), name)
-    except CorruptAttachmentError as e:
-        typer.echo(f"Error: attachment '{name}' is corrupt: {e}", err=True)
-        raise typer.Exit(1) from None
-    if att is None or att.data is None:
+    # write_data reports the byte count, so the stream is not measured first.
+    att = get_attachment(str(pdf), name, with_data=False, with_size=False)
+    if att is None or not att.has_data:
         typer.echo(f"Error: attachment '{name}' not found in {pdf}.", err=True)
         raise typer.Exit(1)
 
     out = output if output else Path(att.name)
-    out.write_bytes(att.data)
-    typer.echo(f"Extracted: {att.name} → {out}  ({len(att.data)} bytes)")
+    try:
+        size = _write_output(att, out)
+    except CorruptAttachmentError as e:
+        typer.echo(f"Error: attachment '{name}' is corrupt: {e}", err=True)
+        raise typer.Exit(1) from None
+    except OSError as e:
+        typer.echo(f"Error: cannot write {out}: {e}", err=True)
+        raise typer.Exit(1) from None
+    typer.echo(f"Extracted: {att.name} → {out}  ({size} bytes)")
 
 
 def _parse_renames(raw: list[str] | None) -> dict[str, str]:
@@ -369,8 +851,19 @@ def cmd_add(
             help=("Rename an attachment: 'original:newname'. Repeatable for multiple files."),
         ),
     ] = None,
+    incremental: Annotated[
+        bool,
+        typer.Option(
+            "--incremental/--no-incremental",
+            help=(
+                "Append the attachments as an incremental update instead of rewriting "
+                "the whole PDF (default: --no-incremental). Falls back to a full "
+                "rewrite when the PDF cannot be updated safely."
+            ),
+        ),
+    ] = False,
 ) -> None:
-    """Clones the input PDF, embeds the given files, and writes the result.
+    """Embeds the given files into the input PDF and writes the result.
 
     Prints: "Added <N> attachment(s) → <path>" on success.
     Exit code 1 if any input file is missing or names collide.
@@ -409,7 +902,7 @@ def cmd_add(
 
     out = str(output) if output else str(pdf)
     try:
-        count = add_attachment(str(pdf), files, out, renames=renames)
+        count = add_attachment(str(pdf), files, out, renames=renames, incremental=incremental)
     except ValueError as e:
         typer.echo(f"Error: {e}", err=True)
         raise typer.Exit(1) from None
@@ -0,0 +1,48 @@
+"""Shared fixtures."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from pypdf import PdfWriter
+from pypdf.generic import (
+    ArrayObject,
+    DecodedStreamObject,
+    DictionaryObject,
+    NameObject,
+    TextStringObject,
+)
+
+
+@pytest.fixture()
+def page_pdf(tmp_path: Path) -> Path:
+    """Create a PDF with a /FileAttachment annotation on its second page."""
+    pdf = tmp_path / "page.pdf"
+    writer = PdfWriter()
+    writer.add_blank_page(width=72, height=72)
+    page = writer.add_blank_page(width=72, height=72)
+
+    stream = DecodedStreamObject()
+    stream.set_data(b"annotated bytes")
+    stream[NameObject("/Type")] = NameObject("/EmbeddedFile")
+    fs = DictionaryObject(
+        {
+            NameObject("/Type"): NameObject("/Filespec"),
+            NameObject("/F"): TextStringObject("note.txt"),
+            NameObject("/EF"): DictionaryObject({NameObject("/F"): writer._add_object(stream)}),
+        }
+    )
+    annot = DictionaryObject(
+        {
+            NameObject("/Type"): NameObject("/Annot"),
+            NameObject("/Subtype"): NameObject("/FileAttachment"),
+            NameObject("/Rect"): ArrayObject([]),
+            NameObject("/Contents"): TextStringObject("a page note"),
+            NameObject("/FS"): writer._add_object(fs),
+        }
+    )
+    page[NameObject("/Annots")] = ArrayObject([writer._add_object(annot)])
+    with open(pdf, "wb") as f:
+        writer.write(f)
+    return pdf
@@ -75,6 +75,22 @@ class TestAddAttachmentAPI:
         with pytest.raises(ValueError, match="already exist"):
             add_attachment(str(pdf_with_attachment), [new_file], str(pdf_with_attachment))
 
+    def test_duplicate_with_page_attachment(self, page_pdf: Path, tmp_path: Path) -> None:
+        """Page-level attachment names also count as existing."""
+        new_file = tmp_path / "note.txt"
+        new_file.write_text("clash")
+        with pytest.raises(ValueError, match="already exist"):
+            add_attachment(str(page_pdf), [new_file], str(tmp_path / "out.pdf"))
+
+    def test_duplicates_reported_in_input_order(self, minimal_pdf: Path, tmp_path: Path) -> None:
+        first, second = tmp_path / "a.txt", tmp_path / "b.txt"
+        first.write_text("a")
+        second.write_text("b")
+        out = tmp_path / "out.pdf"
+        add_attachment(str(minimal_pdf), [first, second], str(out))
+        with pytest.raises(ValueError, match="'b.txt', 'a.txt'"):
+            add_attachment(str(out), [second, first], str(tmp_path / "again.pdf"))
+
     def test_duplicate_among_inputs(self, minimal_pdf: Path, tmp_path: Path) -> None:
         """Two input files resolving to the same name should raise."""
         dir_a = tmp_path / "a"
@@ -134,6 +150,60 @@ class TestAddAttachmentAPI:
         assert att is not None
         assert att.data == content
 
+    def test_add_empty_file(self, minimal_pdf: Path, tmp_path: Path) -> None:
+        empty = tmp_path / "empty.txt"
+        empty.write_bytes(b"")
+        out = tmp_path / "out.pdf"
+        add_attachment(str(minimal_pdf), [empty], str(out))
+        att = get_attachment(str(out), "empty.txt")
+        assert att is not None
+        assert att.data == b""
+
+    def test_add_output_as_input(self, minimal_pdf: Path) -> None:
+        """Attaching the PDF being overwritten must embed its original bytes."""
+        original = minimal_pdf.read_bytes()
+        add_attachment(str(minimal_pdf), [minimal_pdf], str(minimal_pdf))
+        att = get_attachment(str(minimal_pdf), minimal_pdf.name)
+        assert att is not None
+        assert att.data == original
+
+    def test_incremental_appends_to_original(
+        self, pdf_with_attachment: Path, tmp_path: Path
+    ) -> None:
+        """An incremental update keeps the original bytes as a prefix of the output."""
+        original = pdf_with_attachment.read_bytes()
+        out = tmp_path / "out.pdf"
+        add_attachment(str(pdf_with_attachment), [self._file(tmp_path)], str(out), incremental=True)
+        assert out.read_bytes().startswith(original)
+        assert {a.name for a in list_attachments(str(out))} == {"existing.txt", "new.txt"}
+
+    def test_full_rewrite(self, pdf_with_attachment: Path, tmp_path: Path) -> None:
+        original = pdf_with_attachment.read_bytes()
+        out = tmp_path / "out.pdf"
+        add_attachment(str(pdf_with_attachment), [self._file(tmp_path)], str(out))
+        assert not out.read_bytes().startswith(original)
+        assert {a.name for a in list_attachments(str(out))} == {"existing.txt", "new.txt"}
+
+    @pytest.mark.parametrize("incremental", [False, True])
+    def test_successive_adds_keep_every_payload(
+        self, minimal_pdf: Path, tmp_path: Path, incremental: bool
+    ) -> None:
+        """Repeated adds to the same file must not overwrite earlier attachments."""
+        for i in range(3):
+            f = tmp_path / f"f{i}.txt"
+            f.write_text(f"payload {i}")
+            add_attachment(str(minimal_pdf), [f], str(minimal_pdf), incremental=incremental)
+        for i in range(3):
+            att = get_attachment(str(minimal_pdf), f"f{i}.txt")
+            assert att is not None
+            assert att.data == f"payload {i}".encode()
+
+    @staticmethod
+    def _file(tmp_path: Path) -> Path:
+        f = tmp_path / "new.txt"
+        f.write_text("new")
+        return f
+
 
 # ── --in-place CLI tests ─────────────────────────────────────────────
 
@@ -172,6 +242,15 @@ class TestInPlace:
         assert result.exit_code == 0
         assert "Added 1" in result.stdout
 
+    def test_cli_incremental(self, minimal_pdf: Path, sample_file: Path, tmp_path: Path) -> None:
+        out = tmp_path / "out.pdf"
+        result = runner.invoke(
+            app, ["add", str(minimal_pdf), str(sample_file), "-o", str(out), "--incremental"]
+        )
+        assert result.exit_code == 0
+        assert out.read_bytes().startswith(minimal_pdf.read_bytes())
+        assert len(list_attachments(str(out))) == 1
+
     def test_cli_output_works(self, minimal_pdf: Path, sample_file: Path, tmp_path: Path) -> None:
         """--output should write to a different file."""
         out = tmp_path / "out.pdf"
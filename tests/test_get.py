@@ -0,0 +1,343 @@
+"""Tests for get/list: document-level vs page-level lookup and data extraction."""
+
+from __future__ import annotations
+
+import io
+import os
+import random
+import stat
+import zlib
+from pathlib import Path
+from typing import Any
+
+import pytest
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import DictionaryObject, NameObject, NumberObject, TextStringObject
+from typer.testing import CliRunner
+
+from pdf_attachments import (
+    Attachment,
+    CorruptAttachmentError,
+    add_attachment,
+    app,
+    get_attachment,
+    get_attachments_bulk,
+    list_attachments,
+)
+
+runner = CliRunner()
+
+
+@pytest.fixture()
+def multi_pdf(tmp_path: Path) -> Path:
+    """Create a PDF with three document-level attachments."""
+    pdf = tmp_path / "multi.pdf"
+    writer = PdfWriter()
+    writer.add_blank_page(width=72, height=72)
+    for i in range(3):
+        writer.add_attachment(f"file{i}.txt", f"content {i}".encode())
+    with open(pdf, "wb") as f:
+        writer.write(f)
+    return pdf
+
+
+@pytest.fixture()
+def corrupt_pdf(tmp_path: Path) -> Path:
+    """Create a PDF whose only attachment uses an undecodable filter."""
+    pdf = tmp_path / "corrupt.pdf"
+    writer = PdfWriter()
+    writer.add_blank_page(width=72, height=72)
+    writer.add_attachment("bad.bin", b"xx")
+    names = writer.root_object["/Names"]["/EmbeddedFiles"]["/Names"]
+    stream = names[1].get_object()["/EF"]["/F"].get_object()
+    stream[NameObject("/Filter")] = NameObject("/Bogus")
+    with open(pdf, "wb") as f:
+        writer.write(f)
+    return pdf
+
+
+def _write_flate_pdf(pdf: Path, name: str, payload: bytes, *, damage: bool = False) -> None:
+    """Write a PDF with one Flate-compressed attachment, optionally damaged mid-stream."""
+    writer = PdfWriter()
+    writer.add_blank_page(width=72, height=72)
+    writer.add_attachment(name, b"")
+    names = writer.root_object["/Names"]["/EmbeddedFiles"]["/Names"]
+    stream = names[1].get_object()["/EF"]["/F"].get_object()
+    compressed = bytearray(zlib.compress(payload))
+    if damage:
+        middle = len(compressed) // 2
+        compressed[middle : middle + 16] = b"\xff" * 16
+    stream.set_data(bytes(compressed))
+    stream[NameObject("/Filter")] = NameObject("/FlateDecode")
+    with open(pdf, "wb") as f:
+        writer.write(f)
+
+
+class TestGetAttachment:
+    def test_get_picks_named_attachment(self, multi_pdf: Path) -> None:
+        att = get_attachment(str(multi_pdf), "file1.txt")
+        assert att is not None
+        assert att.name == "file1.txt"
+        assert att.data == b"content 1"
+
+    def test_get_missing_returns_none(self, multi_pdf: Path) -> None:
+        assert get_attachment(str(multi_pdf), "nope.txt") is None
+
+    def test_get_decodes_first_match_only(self, tmp_path: Path) -> None:
+        """A later, undecodable entry with the same name is never decoded."""
+        pdf = tmp_path / "dup.pdf"
+        writer = PdfWriter()
+        writer.add_blank_page(width=72, height=72)
+        writer.add_attachment("dup.bin", b"one")
+        writer.add_attachment("dup.bin", b"two")
+        names = writer.root_object["/Names"]["/EmbeddedFiles"]["/Names"]
+        first = names[1].get_object()["/EF"]["/F"].get_object().get_data()
+        second = names[3].get_object()["/EF"]["/F"].get_object()
+        second[NameObject("/Filter")] = NameObject("/Bogus")
+        with open(pdf, "wb") as f:
+            writer.write(f)
+        att = get_attachment(str(pdf), "dup.bin")
+        assert att is not None
+        assert att.data == first
+
+    def test_get_page_attachment(self, page_pdf: Path) -> None:
+        att = get_attachment(str(page_pdf), "note.txt")
+        assert att is not None
+        assert att.page == 2
+        assert att.data == b"annotated bytes"
+
+    def test_document_attachment_found_alongside_page(self, page_pdf: Path, tmp_path: Path) -> None:
+        extra = tmp_path / "doc.txt"
+        extra.write_text("doc level")
+        out = tmp_path / "out.pdf"
+        add_attachment(str(page_pdf), [extra], str(out))
+        att = get_attachment(str(out), "doc.txt")
+        assert att is not None
+        assert att.page is None
+        assert att.data == b"doc level"
+
+    def test_get_without_data_streams_on_demand(self, multi_pdf: Path, tmp_path: Path) -> None:
+        att = get_attachment(str(multi_pdf), "file0.txt", with_data=False)
+        assert att is not None
+        assert att.data is None
+        assert att.has_data
+        out = tmp_path / "streamed.txt"
+        with open(out, "wb") as fh:
+            assert att.write_data(fh) == 9
+        assert out.read_bytes() == b"content 0"
+
+    def test_get_with_reader_uses_index(
+        self, page_pdf: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Lookups on a caller-supplied reader walk the PDF only once."""
+        import pdf_attachments
+
+        reader = PdfReader(page_pdf)
+        att = get_attachment(reader, "note.txt")
+        assert att is not None
+        assert att.page == 2
+        assert att.data == b"annotated bytes"
+
+        def fail(_reader: PdfReader) -> None:
+            raise AssertionError("pages rescanned")
+
+        monkeypatch.setattr(pdf_attachments, "_iter_page_specs", fail)
+        assert get_attachment(reader, "note.txt") is not None
+        assert get_attachment(reader, "missing.txt") is None
+
+    def test_bulk_returns_requested_in_order(self, page_pdf: Path, tmp_path: Path) -> None:
+        payload = random.Random(3).randbytes(1 << 20)
+        pdf = tmp_path / "big.pdf"
+        _write_flate_pdf(pdf, "big.bin", payload)
+        extra = tmp_path / "doc.txt"
+        extra.write_text("doc level")
+        out = tmp_path / "out.pdf"
+        add_attachment(str(pdf), [extra], str(out))
+        result = get_attachments_bulk(str(out), ["doc.txt", "missing", "big.bin", "doc.txt"])
+        assert list(result) == ["doc.txt", "big.bin"]
+        assert result == {"doc.txt": b"doc level", "big.bin": payload}
+        assert get_attachments_bulk(PdfReader(page_pdf), ["note.txt"], max_workers=1) == {
+            "note.txt": b"annotated bytes"
+        }
+
+    def test_bulk_damaged_flate_falls_back_to_pypdf(self, tmp_path: Path) -> None:
+        pdf = tmp_path / "damaged.pdf"
+        _write_flate_pdf(pdf, "damaged.bin", random.Random(1).randbytes(1 << 20), damage=True)
+        expected = PdfReader(pdf).attachments["damaged.bin"][0]
+        assert get_attachments_bulk(str(pdf), ["damaged.bin"]) == {"damaged.bin": expected}
+
+    def test_bulk_corrupt_raises(self, corrupt_pdf: Path) -> None:
+        with pytest.raises(CorruptAttachmentError):
+            get_attachments_bulk(str(corrupt_pdf), ["bad.bin"])
+
+    def test_get_from_stream(self, multi_pdf: Path) -> None:
+        """A file-like input is opened like a path, as in list_attachments."""
+        att = get_attachment(io.BytesIO(multi_pdf.read_bytes()), "file2.txt")
+        assert att is not None
+        assert att.data == b"content 2"
+
+
+class TestListAttachments:
+    def test_list_with_reader(self, multi_pdf: Path) -> None:
+        names = [a.name for a in list_attachments(PdfReader(multi_pdf))]
+        assert names == ["file0.txt", "file1.txt", "file2.txt"]
+
+    def test_list_document_and_page(self, page_pdf: Path, tmp_path: Path) -> None:
+        extra = tmp_path / "doc.txt"
+        extra.write_text("doc level")
+        out = tmp_path / "out.pdf"
+        add_attachment(str(page_pdf), [extra], str(out))
+        atts = list_attachments(str(out))
+        assert [(a.name, a.page) for a in atts] == [("doc.txt", None), ("note.txt", 2)]
+        assert all(a.data is None for a in atts)
+
+    def test_list_document_only(self, page_pdf: Path, tmp_path: Path) -> None:
+        extra = tmp_path / "doc.txt"
+        extra.write_text("doc level")
+        out = tmp_path / "out.pdf"
+        add_attachment(str(page_pdf), [extra], str(out))
+        atts = list_attachments(str(out), include_page_annots=False)
+        assert [a.name for a in atts] == ["doc.txt"]
+
+    def test_cli_list_no_page_annots(self, page_pdf: Path) -> None:
+        result = runner.invoke(app, ["list", str(page_pdf), "--no-page-annots"])
+        assert result.exit_code == 0
+        assert "Attachments: 0" in result.stdout
+        result = runner.invoke(app, ["list", str(page_pdf)])
+        assert "Attachments: 1" in result.stdout
+        assert "note.txt (page 2)" in result.stdout
+
+    def test_list_reports_sizes(self, multi_pdf: Path) -> None:
+        atts = list_attachments(str(multi_pdf))
+        assert [a.size for a in atts] == [9, 9, 9]
+
+    @pytest.mark.parametrize(("declared", "expected"), [(NumberObject(1234), 1234), (None, 2)])
+    def test_list_prefers_params_size(
+        self, tmp_path: Path, declared: NumberObject | None, expected: int
+    ) -> None:
+        """/Params /Size is trusted when valid; otherwise the stream is measured."""
+        pdf = tmp_path / "params.pdf"
+        writer = PdfWriter()
+        writer.add_blank_page(width=72, height=72)
+        writer.add_attachment("sized.bin", b"xx")
+        names = writer.root_object["/Names"]["/EmbeddedFiles"]["/Names"]
+        stream = names[1].get_object()["/EF"]["/F"].get_object()
+        size = declared if declared is not None else TextStringObject("not a number")
+        stream[NameObject("/Params")] = DictionaryObject({NameObject("/Size"): size})
+        with open(pdf, "wb") as f:
+            writer.write(f)
+        assert list_attachments(str(pdf))[0].size == expected
+
+    def test_list_sizes_flate_stream(self, tmp_path: Path) -> None:
+        """Without /Params /Size, the inflated length is reported."""
+        payload = random.Random(2).randbytes(2 << 20)
+        pdf = tmp_path / "big.pdf"
+        _write_flate_pdf(pdf, "big.bin", payload)
+        assert list_attachments(str(pdf))[0].size == len(payload)
+
+    def test_attachment_str(self) -> None:
+        assert str(Attachment("a.txt", 3)) == "  a.txt  —  3 bytes"
+        assert str(Attachment("b.txt", None, "notes", page=4)) == (
+            "  b.txt (page 4)  —  unknown\n    notes"
+        )
+
+
+class TestGetCLI:
+    def test_cli_get_writes_file(self, multi_pdf: Path, tmp_path: Path) -> None:
+        out = tmp_path / "extracted.txt"
+        result = runner.invoke(app, ["get", str(multi_pdf), "file2.txt", "-o", str(out)])
+        assert result.exit_code == 0
+        assert "Extracted: file2.txt" in result.stdout
+        assert out.read_bytes() == b"content 2"
+
+    def test_cli_get_corrupt_attachment(self, corrupt_pdf: Path, tmp_path: Path) -> None:
+        out = tmp_path / "bad.bin"
+        result = runner.invoke(app, ["get", str(corrupt_pdf), "bad.bin", "-o", str(out)])
+        assert result.exit_code == 1
+        assert "is corrupt" in result.stderr
+        assert not out.exists()
+
+    def test_cli_get_corrupt_keeps_existing_output(self, corrupt_pdf: Path, tmp_path: Path) -> None:
+        """A failed extraction must not truncate or delete a file already at the output."""
+        out = tmp_path / "keep.bin"
+        out.write_bytes(b"user data")
+        result = runner.invoke(app, ["get", str(corrupt_pdf), "bad.bin", "-o", str(out)])
+        assert result.exit_code == 1
+        assert out.read_bytes() == b"user data"
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["corrupt.pdf", "keep.bin"]
+
+    def test_cli_get_overwrites_existing_output(self, multi_pdf: Path, tmp_path: Path) -> None:
+        out = tmp_path / "existing.txt"
+        out.write_bytes(b"old contents that are longer")
+        out.chmod(0o640)
+        result = runner.invoke(app, ["get", str(multi_pdf), "file1.txt", "-o", str(out)])
+        assert result.exit_code == 0
+        assert out.read_bytes() == b"content 1"
+        assert out.stat().st_mode & 0o777 == 0o640
+
+    def test_cli_get_writes_through_symlink(self, multi_pdf: Path, tmp_path: Path) -> None:
+        target = tmp_path / "target.txt"
+        target.write_bytes(b"old")
+        link = tmp_path / "link.txt"
+        link.symlink_to(target)
+        result = runner.invoke(app, ["get", str(multi_pdf), "file1.txt", "-o", str(link)])
+        assert result.exit_code == 0
+        assert link.is_symlink()
+        assert target.read_bytes() == b"content 1"
+
+    def test_cli_get_to_dev_null(self, multi_pdf: Path) -> None:
+        """Device outputs are written to, never replaced."""
+        result = runner.invoke(app, ["get", str(multi_pdf), "file1.txt", "-o", os.devnull])
+        assert result.exit_code == 0
+        assert stat.S_ISCHR(os.stat(os.devnull).st_mode)
+
+    def test_cli_get_ignores_stale_part_file(self, multi_pdf: Path, tmp_path: Path) -> None:
+        out = tmp_path / "out.txt"
+        stale = tmp_path / f".out.txt.{os.getpid()}.0.part"
+        stale.write_bytes(b"stale")
+        result = runner.invoke(app, ["get", str(multi_pdf), "file1.txt", "-o", str(out)])
+        assert result.exit_code == 0
+        assert out.read_bytes() == b"content 1"
+        assert stale.read_bytes() == b"stale"
+
+    def test_cli_get_large_flate_attachment(self, tmp_path: Path) -> None:
+        """Compressed attachments larger than one chunk are inflated intact."""
+        payload = random.Random(0).randbytes(3 << 20) + b"tail" * 100_000
+        pdf = tmp_path / "big.pdf"
+        _write_flate_pdf(pdf, "big.bin", payload)
+        out = tmp_path / "big.bin"
+        result = runner.invoke(app, ["get", str(pdf), "big.bin", "-o", str(out)])
+        assert result.exit_code == 0
+        assert f"({len(payload)} bytes)" in result.stdout
+        assert out.read_bytes() == payload
+
+    def test_cli_get_inflates_once(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Without /Params /Size, get does not inflate the stream just to size it."""
+        payload = random.Random(4).randbytes(4 << 20)
+        pdf = tmp_path / "big.pdf"
+        _write_flate_pdf(pdf, "big.bin", payload)
+        inflaters = []
+        decompressobj = zlib.decompressobj
+
+        def counting_decompressobj() -> Any:
+            inflaters.append(decompressobj())
+            return inflaters[-1]
+
+        monkeypatch.setattr(zlib, "decompressobj", counting_decompressobj)
+        out = tmp_path / "big.bin"
+        result = runner.invoke(app, ["get", str(pdf), "big.bin", "-o", str(out)])
+        assert result.exit_code == 0
+        assert out.read_bytes() == payload
+        assert len(inflaters) == 1
+
+    def test_damaged_flate_falls_back_to_pypdf(self, tmp_path: Path) -> None:
+        """A stream that fails mid-inflate is rewritten from pypdf's decoder."""
+        pdf = tmp_path / "damaged.pdf"
+        _write_flate_pdf(pdf, "damaged.bin", random.Random(1).randbytes(1 << 20), damage=True)
+        expected = PdfReader(pdf).attachments["damaged.bin"][0]
+        att = get_attachment(str(pdf), "damaged.bin", with_data=False)
+        assert att is not None
+        out = tmp_path / "damaged.bin"
+        with open(out, "wb") as fh:
+            assert att.write_data(fh) == len(expected)
+        assert out.read_bytes() == expected